@@ -3,34 +3,164 @@ Custom RSS Feed Generator for JavaScript-rendered websites
 Uses Playwright to render JS and generate RSS feeds
 """
 
-from flask import Flask, Response, request
-from playwright.sync_api import sync_playwright, Error as PlaywrightError
+from flask import Flask, Response, jsonify, request
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from feedgen.feed import FeedGenerator
+from cachetools import TLRUCache
 from datetime import datetime, timezone
-from urllib.parse import urljoin, quote
+from urllib.parse import urljoin, urlparse, quote
+from collections import deque
+from fnmatch import fnmatch
+from functools import lru_cache
+from math import ceil
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+import asyncio
 import atexit
+import concurrent.futures
 import hashlib
+import html
 import json
 import logging
 import os
 import re
+import tempfile
+import threading
+import time
+import weakref
+
+try:
+    import redis
+except ImportError:  # optional -- without it the cache stays in-process
+    redis = None
 
 app = Flask(__name__)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Cache to avoid re-scraping too frequently
-cache = {}
 CACHE_DURATION = 600  # 10 minutes
+CACHE_MAX_ENTRIES = int(os.environ.get("SCRAPER_CACHE_MAX_ENTRIES", "1024"))
+# How long past CACHE_DURATION a feed is kept to serve if re-scraping fails
+CACHE_STALE_GRACE = int(os.environ.get("SCRAPER_CACHE_STALE_GRACE", "3600"))  # seconds
+
+# Named cache lifetimes; pick one per host with SCRAPER_CACHE_POLICY_<host glob>=<tier or seconds>,
+# e.g. SCRAPER_CACHE_POLICY_news.*=short. When several globs match a host the longest one wins.
+CACHE_TIERS = {"short": 60, "normal": CACHE_DURATION, "long": 3600}
+
+
+def _parse_cache_policies() -> list:
+    """Read SCRAPER_CACHE_POLICY_* into (glob, seconds) pairs, most specific glob first."""
+    policies = []
+    for name, value in os.environ.items():
+        if not name.startswith("SCRAPER_CACHE_POLICY_"):
+            continue
+        tier = value.strip().lower()
+        if tier in CACHE_TIERS:
+            ttl = CACHE_TIERS[tier]
+        elif tier.isdigit():
+            ttl = int(tier)
+        else:
+            logger.warning(f"Ignoring {name}={value!r}: expected {', '.join(CACHE_TIERS)} or a number of seconds")
+            continue
+        policies.append((name[len("SCRAPER_CACHE_POLICY_"):].lower(), ttl))
+    # Longest glob first, ties broken by name, so the outcome never depends on environment order
+    return sorted(policies, key=lambda p: (-len(p[0]), p[0]))
+
+
+CACHE_POLICIES = _parse_cache_policies()
+
+# Cache to avoid re-scraping too frequently. Shared through Redis when
+# SCRAPER_REDIS_URL is set (configure the server with an LFU maxmemory-policy),
+# otherwise kept in-process and lost on restart.
+REDIS_URL = os.environ.get("SCRAPER_REDIS_URL")
+if REDIS_URL and redis is None:
+    logger.warning("SCRAPER_REDIS_URL is set but the redis package is not installed; using in-process cache")
+_redis = redis.Redis.from_url(REDIS_URL) if REDIS_URL and redis else None
+
+cache = TLRUCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttu=lambda _key, entry, _now: entry["stale_at"] + CACHE_STALE_GRACE,
+    timer=time.time,
+)
+_cache_lock = threading.Lock()
+_inflight = {}  # cache key -> Future for the scrape currently refreshing it
+
+# RSS serializer: "fast" (built-in string writer) or "feedgen"
+RSS_WRITER = os.environ.get("SCRAPER_RSS_WRITER", "fast")
+
+# How long a request handler waits on the browser loop before giving up
+SCRAPE_TIMEOUT = 90  # seconds
+
+# Browser context pool -- one pre-warmed context is leased per request
+POOL_MIN_SIZE = int(os.environ.get("SCRAPER_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.environ.get("SCRAPER_POOL_MAX_SIZE", "4"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("SCRAPER_POOL_IDLE_TIMEOUT", "300"))  # seconds
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get("SCRAPER_POOL_ACQUIRE_TIMEOUT", "30"))  # seconds
+# Per-host cookies/storage saved after each scrape and loaded into new contexts
+STATE_DIR = os.environ.get("SCRAPER_STATE_DIR", ".state")
+STATE_SAVE_INTERVAL = float(os.environ.get("SCRAPER_STATE_SAVE_INTERVAL", "300"))  # seconds per host
+STATE_MAX_FILES = int(os.environ.get("SCRAPER_STATE_MAX_FILES", "500"))  # oldest hosts are dropped first
+
+CONTEXT_OPTIONS = {"viewport": {"width": 1280, "height": 800}}
+if os.environ.get("SCRAPER_USER_AGENT"):
+    CONTEXT_OPTIONS["user_agent"] = os.environ["SCRAPER_USER_AGENT"]
+
+# CDP endpoint of a separately managed Chrome (e.g. browserless/chrome). When set
+# the scraper connects to it instead of launching its own Chromium.
+CDP_URL = os.environ.get("SCRAPER_CDP_URL")
+
+# Recycle the browser after this many pages or minutes to cap its memory growth
+RECYCLE_AFTER_PAGES = int(os.environ.get("SCRAPER_RECYCLE_PAGES", "500"))
+RECYCLE_AFTER_MINUTES = float(os.environ.get("SCRAPER_RECYCLE_MINUTES", "30"))
+
+# Resources never read by the scraper (image URLs come from the `src` attribute)
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+# --- Browser Event Loop ---
+# Playwright's async API runs on one asyncio loop in a background thread.
+# Request handlers submit coroutines to it and block on the result, so many
+# pages can load concurrently without serializing on a lock. The loop is
+# started on first use so each gunicorn worker gets its own after forking.
+
+_loop = None
+_loop_lock = threading.Lock()
+_janitor = None  # concurrent Future wrapping the janitor task
+
+
+def _get_loop():
+    """Get the browser event loop, starting its thread on first use."""
+    global _loop, _janitor
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="playwright-loop", daemon=True).start()
+            _janitor = asyncio.run_coroutine_threadsafe(_janitor_async(), _loop)
+    return _loop
+
+
+def _run(coro, timeout: float = SCRAPE_TIMEOUT):
+    """Run a coroutine on the browser loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Browser task did not finish within {timeout}s")
+
 
 # --- Persistent Browser Singleton ---
 
 _playwright = None
 _browser = None
+_pool = None
+_restart_lock = asyncio.Lock()
+_browser_started_at = None
+_pages_served = 0  # pages opened by the current browser
 
+# Only used for a locally launched browser; a CDP browser is configured by its own container
 CHROMIUM_ARGS = [
-    "--no-zygote",
     "--disable-dev-shm-usage",
     "--disable-gpu",
     "--no-sandbox",
@@ -44,60 +174,367 @@ CHROMIUM_ARGS = [
 ]
 
 
-def _get_browser():
-    """Get or create the persistent browser instance."""
-    global _playwright, _browser
+class ContextPool:
+    """
+    Bounded pool of pre-warmed browser contexts, sharded by host.
+    A context returned for a host is reused for that host's next request, and
+    its cookies/storage are saved to `state_dir` to seed new contexts after a
+    restart. Contexts idle longer than `idle_timeout` are recycled, and the
+    pool is topped back up to `min_size` in the background.
+    """
+
+    def __init__(self, browser, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT, acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+                 state_dir: str = STATE_DIR):
+        self._browser = browser
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.state_dir = state_dir
+        self.in_use = 0
+        # host (None for fresh, pre-warmed contexts) -> (context, last_used) pairs, most recently used last
+        self._idle = {None: deque()}
+        self._slots = asyncio.Semaphore(max_size)
+        self._state_saved_at = {}  # host -> monotonic time of its last state save
+        self._dead = weakref.WeakSet()
+        self._closed = False
+        self._reaper = None
+
+    async def start(self):
+        """Pre-warm `min_size` contexts and start the idle reaper."""
+        for _ in range(self.min_size):
+            self._idle[None].append((await self._new_context(), time.monotonic()))
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def acquire(self, key: str = None, timeout: float = None):
+        """
+        Lease a context for host `key`, waiting up to `timeout` seconds for a free slot.
+        Prefers a warm context for the same host, then one seeded from its saved state.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No browser context available within {timeout}s")
+
+        try:
+            context = await self._pop_idle(key) if key else None
+            if context is None and key and os.path.exists(self._state_path(key)):
+                await self._make_room()
+                try:
+                    context = await self._new_context(storage_state=self._state_path(key))
+                except (ValueError, OSError) as e:
+                    # Playwright reads the file itself; a truncated or corrupt one is discarded
+                    logger.warning(f"Discarding unreadable storage state for {key}: {e}")
+                    self._remove_state(key)
+                except PlaywrightError as e:
+                    logger.warning(f"Could not load storage state for {key}: {e}")
+            if context is None:
+                context = await self._pop_idle(None)
+            if context is None:
+                await self._make_room()
+                context = await self._new_context()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self.in_use += 1
+        return context
+
+    async def release(self, context, key: str = None):
+        """Return a leased context to the shard for `key`, closing it instead if it is broken."""
+        self.in_use -= 1
+        if self._closed or not self._is_healthy(context):
+            self._slots.release()
+            await self._close_context(context)
+            return
+        self._idle.setdefault(key, deque()).append((context, time.monotonic()))
+        self._slots.release()
+
+    async def save_state(self, context, key: str):
+        """
+        Persist a context's cookies and storage so new contexts for `key` start warm.
+        Saves at most once per STATE_SAVE_INTERVAL per host; the file is written off the loop thread.
+        """
+        now = time.monotonic()
+        saved_at = self._state_saved_at.get(key)
+        if saved_at is not None and now - saved_at < STATE_SAVE_INTERVAL:
+            return
+        self._state_saved_at[key] = now
+
+        try:
+            state = await context.storage_state()
+            await asyncio.to_thread(self._write_state, key, state)
+        except Exception as e:
+            logger.warning(f"Could not save storage state for {key}: {e}")
+
+    async def drain(self, timeout: float):
+        """Close the pool, then wait up to `timeout` seconds for leased contexts to come back."""
+        await self.close()
+        deadline = time.monotonic() + timeout
+        while self.in_use and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+
+    async def close(self):
+        """Stop the reaper and close all idle contexts."""
+        self._closed = True
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        for shard in self._idle.values():
+            while shard:
+                context, _ = shard.popleft()
+                await self._close_context(context)
+
+    async def _new_context(self, **options):
+        context = await self._browser.new_context(**CONTEXT_OPTIONS, **options)
+        context.on("close", self._dead.add)
+        return context
+
+    def _state_path(self, key: str) -> str:
+        return os.path.join(self.state_dir, re.sub(r"[^A-Za-z0-9.-]", "_", key) + ".json")
+
+    def _remove_state(self, key: str):
+        try:
+            os.remove(self._state_path(key))
+        except OSError:
+            pass
+
+    def _write_state(self, key: str, state: dict):
+        """Atomically replace the state file for `key`, pruning the directory when a host is added."""
+        path = self._state_path(key)
+        os.makedirs(self.state_dir, exist_ok=True)
+        is_new = not os.path.exists(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if is_new:
+            self._prune_state_dir()
+
+    def _prune_state_dir(self):
+        """Delete the least recently saved state files beyond STATE_MAX_FILES."""
+        paths = [
+            os.path.join(self.state_dir, name)
+            for name in os.listdir(self.state_dir)
+            if name.endswith(".json")
+        ]
+        if len(paths) <= STATE_MAX_FILES:
+            return
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                pass
+        for path in sorted(mtimes, key=mtimes.get)[:len(mtimes) - STATE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _idle_count(self) -> int:
+        return sum(len(shard) for shard in self._idle.values())
+
+    async def _pop_idle(self, key):
+        shard = self._idle.get(key)
+        while shard:
+            context, _ = shard.pop()
+            if self._is_healthy(context):
+                return context
+            await self._close_context(context)
+        return None
+
+    async def _make_room(self):
+        """Close the least recently used idle context if the pool is at `max_size`."""
+        if self._idle_count() + self.in_use < self.max_size:
+            return
+        oldest = min(
+            ((entry, shard) for shard in self._idle.values() for entry in shard),
+            key=lambda pair: pair[0][1],
+            default=None,
+        )
+        if oldest:
+            entry, shard = oldest
+            shard.remove(entry)
+            await self._close_context(entry[0])
+
+    def _is_healthy(self, context) -> bool:
+        if context in self._dead or not self._browser.is_connected():
+            return False
+        try:
+            context.pages
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    async def _close_context(context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _reap_idle(self):
+        while not self._closed:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            try:
+                now = time.monotonic()
+                for key, shard in list(self._idle.items()):
+                    expired = [
+                        entry for entry in shard
+                        if now - entry[1] > self.idle_timeout or not self._is_healthy(entry[0])
+                    ]
+                    for entry in expired:
+                        shard.remove(entry)
+                        await self._close_context(entry[0])
+                    if key is not None and not shard:
+                        del self._idle[key]
+
+                self._state_saved_at = {
+                    key: saved_at for key, saved_at in self._state_saved_at.items()
+                    if now - saved_at < STATE_SAVE_INTERVAL
+                }
+
+                while not self._closed and self._idle_count() + self.in_use < self.min_size:
+                    self._idle[None].append((await self._new_context(), time.monotonic()))
+            except Exception as e:
+                logger.warning(f"Context pool maintenance failed: {e}")
 
-    if _browser and _browser.is_connected():
-        return _browser
+
+async def _get_pool_async() -> ContextPool:
+    """Get the context pool, (re)launching the browser if needed."""
+    if _pool and _browser and _browser.is_connected():
+        return _pool
 
     # Browser is dead or never started -- (re)launch
-    _force_restart_browser()
-    return _browser
+    return await _force_restart_browser_async()
+
+
+async def _force_restart_browser_async() -> ContextPool:
+    """
+    Kill and relaunch the browser with a fresh context pool.
+    Skipped if the current browser is connected once the restart lock is held,
+    so concurrent callers trigger a single relaunch.
+    """
+    async with _restart_lock:
+        if _pool and _browser and _browser.is_connected():
+            return _pool
+
+        logger.info("(Re)connecting to Chromium over CDP..." if CDP_URL else "(Re)launching Chromium browser...")
+
+        # Clean up old instances
+        await _close_browser_async()
+
+        await _launch_browser_async()
+        logger.info("Browser ready.")
+        return _pool
+
+
+async def _launch_browser_async():
+    """Launch (or connect to) a browser with a pre-warmed pool, starting Playwright if needed."""
+    global _playwright, _browser, _pool, _browser_started_at, _pages_served
 
+    if _playwright is None:
+        _playwright = await async_playwright().start()
+    if CDP_URL:
+        browser = await _playwright.chromium.connect_over_cdp(CDP_URL, timeout=30000)
+    else:
+        browser = await _playwright.chromium.launch(
+            headless=True,
+            args=CHROMIUM_ARGS,
+        )
+    pool = ContextPool(browser)
+    await pool.start()
 
-def _force_restart_browser():
-    """Unconditionally kill and relaunch the browser."""
-    global _playwright, _browser
+    _browser, _pool = browser, pool
+    _browser_started_at = time.time()
+    _pages_served = 0
 
-    logger.info("(Re)launching Chromium browser...")
 
-    # Clean up old instances
+async def _recycle_browser_async():
+    """Swap in a fresh browser, then close the old one once its in-flight pages finish."""
+    async with _restart_lock:
+        old_browser, old_pool = _browser, _pool
+        logger.info("Recycling Chromium browser...")
+        await _launch_browser_async()
+
+    await old_pool.drain(SCRAPE_TIMEOUT)
+    try:
+        await old_browser.close()
+    except Exception:
+        pass
+    logger.info("Browser recycled.")
+
+
+async def _browser_version_async() -> str:
+    """Ask the browser for its version over CDP, proving the connection is alive."""
+    session = await _browser.new_browser_cdp_session()
+    try:
+        version = await session.send("Browser.getVersion")
+    finally:
+        await session.detach()
+    return version["product"]
+
+
+async def _janitor_async():
+    """Recycle the browser once it has served too many pages or run too long."""
+    while True:
+        await asyncio.sleep(60)
+        if not (_browser and _browser.is_connected()):
+            continue
+        age = time.time() - _browser_started_at
+        if _pages_served >= RECYCLE_AFTER_PAGES or age >= RECYCLE_AFTER_MINUTES * 60:
+            try:
+                await _recycle_browser_async()
+            except Exception as e:
+                logger.warning(f"Browser recycle failed: {e}")
+
+
+async def _close_browser_async():
+    """Close the pool and browser and stop Playwright, ignoring errors."""
+    global _playwright, _browser, _pool
+    if _pool:
+        await _pool.close()
+        _pool = None
     if _browser:
         try:
-            _browser.close()
+            await _browser.close()
         except Exception:
             pass
         _browser = None
     if _playwright:
         try:
-            _playwright.stop()
+            await _playwright.stop()
         except Exception:
             pass
         _playwright = None
 
-    _playwright = sync_playwright().start()
-    _browser = _playwright.chromium.launch(
-        headless=True,
-        args=CHROMIUM_ARGS,
-    )
-    logger.info("Browser launched successfully.")
-
 
 def _shutdown_browser():
     """Clean up browser on process exit."""
-    global _playwright, _browser
+    global _loop
+    if _loop is None:
+        return
     logger.info("Shutting down browser...")
-    if _browser:
-        try:
-            _browser.close()
-        except Exception:
-            pass
-    if _playwright:
-        try:
-            _playwright.stop()
-        except Exception:
-            pass
+    try:
+        # Closing the pool also stops its reaper; Playwright's own tasks must keep
+        # running until the browser has closed, so only the janitor is cancelled
+        _run(_close_browser_async(), timeout=10)
+        _janitor.cancel()
+        _run(asyncio.sleep(0), timeout=1)  # let the cancellation land before the loop stops
+    except Exception:
+        pass
+    loop, _loop = _loop, None
+    loop.call_soon_threadsafe(loop.stop)
 
 
 atexit.register(_shutdown_browser)
@@ -109,107 +546,178 @@ def _is_browser_crash(error: Exception) -> bool:
     return any(keyword in msg for keyword in [
         "target closed", "browser has been closed", "connection closed",
         "target page, context or browser has been closed",
-        "browser.newpage", "page.goto",
+        # Playwright prefixes errors with the Python API name, e.g. "Browser.new_context: ..."
+        "new_page", "browser.new_context", "page.goto",
     ])
 
 
-def _scrape_page(url: str, config: dict) -> list:
-    """Core scraping logic -- opens a page, scrapes items, closes page."""
-    items = []
-    browser = _get_browser()
-    page = browser.new_page()
+async def _with_context_async(func, *args, key: str = None, max_attempts: int = 2):
+    """
+    Run `func(context, *args)` on a context pooled for host `key`, with automatic
+    retry on browser crash. If the browser dies mid-request, restart it and retry once.
+    """
+    global _pages_served
 
+    for attempt in range(1, max_attempts + 1):
+        pool = await _get_pool_async()
+        context = None
+        try:
+            context = await pool.acquire(key)
+            _pages_served += 1
+            result = await func(context, *args)
+            if key:
+                await pool.save_state(context, key)
+            return result
+        except Exception as e:
+            if attempt < max_attempts and _is_browser_crash(e):
+                logger.warning(f"Browser crashed on attempt {attempt}, restarting: {e}")
+                await _force_restart_browser_async()
+                continue
+            raise
+        finally:
+            if context is not None:
+                await pool.release(context, key)
+
+
+async def _block_resources(route):
+    """Abort requests for resource types the scraper never reads."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _wait_for_network_idle(page, timeout: int = 8000):
+    """Wait for late XHR-rendered content, giving up quietly after `timeout` ms."""
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=60000)
-        page.wait_for_timeout(5000)  # Extra wait for dynamic content
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+
+
+_DATE_RE = re.compile(r'\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4}')
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(text: str, fmt: str) -> datetime:
+    """Parse a scraped date as UTC; memoized since feeds repeat the same dates."""
+    return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+
+
+# Runs inside the page and extracts up to 20 items in a single CDP round trip.
+# Each selector string is reused for every item, so Blink parses it once and
+# answers the rest from its per-document selector cache.
+_EXTRACT_ITEMS_JS = """
+(cfg) => {
+    const find = (el, sel) => (sel ? el.querySelector(sel) : null);
+    const text = (el, sel) => {
+        const found = find(el, sel);
+        return found ? (found.innerText ?? found.textContent).trim() : null;
+    };
+    const attr = (el, sel, name) => {
+        const found = find(el, sel);
+        return found ? found.getAttribute(name) : null;
+    };
+
+    return Array.from(document.querySelectorAll(cfg.item_selector)).slice(0, 20).map((el) => {
+        try {
+            return {
+                title: text(el, cfg.title_selector),
+                link: attr(el, cfg.link_selector, "href"),
+                description: text(el, cfg.description_selector),
+                image: attr(el, cfg.image_selector, "src"),
+                date: text(el, cfg.date_selector),
+            };
+        } catch (e) {
+            return {error: String(e)};
+        }
+    });
+}
+"""
 
-        # Find all items
-        elements = page.query_selector_all(config.get("item_selector", "article"))
 
-        for element in elements[:20]:  # Limit to 20 items
-            try:
-                item = {}
-
-                # Get title
-                title_el = element.query_selector(config.get("title_selector", "h2, h3, h4"))
-                if title_el:
-                    item["title"] = title_el.inner_text().strip()
-
-                # Get link
-                link_el = element.query_selector(config.get("link_selector", "a"))
-                if link_el:
-                    href = link_el.get_attribute("href")
-                    if href:
-                        item["link"] = urljoin(url, href)
-
-                # Get description (optional)
-                desc_selector = config.get("description_selector")
-                if desc_selector:
-                    desc_el = element.query_selector(desc_selector)
-                    if desc_el:
-                        item["description"] = desc_el.inner_text().strip()
-
-                # Get image (optional)
-                img_selector = config.get("image_selector")
-                if img_selector:
-                    img_el = element.query_selector(img_selector)
-                    if img_el:
-                        item["image"] = img_el.get_attribute("src")
-
-                # Get date (optional)
-                date_selector = config.get("date_selector")
-                if date_selector:
-                    date_el = element.query_selector(date_selector)
-                    if date_el:
-                        date_text = date_el.inner_text().strip()
-                        date_fmt = config.get("date_format", "%d-%m-%Y")
-                        try:
-                            item["date"] = datetime.strptime(date_text, date_fmt).replace(tzinfo=timezone.utc)
-                        except ValueError:
-                            # Try to extract a date pattern from the text
-                            date_match = re.search(r'\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4}', date_text)
-                            if date_match:
-                                try:
-                                    item["date"] = datetime.strptime(date_match.group(), date_fmt).replace(tzinfo=timezone.utc)
-                                except ValueError:
-                                    pass
-
-                if item.get("title") and item.get("link"):
-                    items.append(item)
+async def _scrape_page_async(context, url: str, config: dict) -> list:
+    """Core scraping logic -- opens a page, scrapes items, closes page."""
+    items = []
+    page = await context.new_page()
 
-            except Exception as e:
-                logger.warning(f"Error parsing item: {e}")
-                continue
+    try:
+        item_selector = config.get("item_selector", "article")
+        await page.route("**/*", _block_resources)
+        await page.goto(url, wait_until="load", timeout=60000)
+
+        # Return as soon as the items exist instead of sleeping a fixed time
+        try:
+            await page.wait_for_selector(item_selector, state="attached", timeout=15000)
+        except PlaywrightTimeoutError:
+            # Best effort: let the network settle and scrape whatever is there
+            await _wait_for_network_idle(page)
+
+        # Extract all items in one round trip
+        raw_items = await page.evaluate(_EXTRACT_ITEMS_JS, {
+            "item_selector": item_selector,
+            "title_selector": config.get("title_selector", "h2, h3, h4"),
+            "link_selector": config.get("link_selector", "a"),
+            "description_selector": config.get("description_selector"),
+            "image_selector": config.get("image_selector"),
+            "date_selector": config.get("date_selector"),
+        })
 
     finally:
         try:
-            page.close()
+            await page.close()
         except Exception:
             pass
 
+    date_fmt = config.get("date_format", "%d-%m-%Y")
+    for raw in raw_items:
+        if raw.get("error"):
+            logger.warning(f"Error parsing item: {raw['error']}")
+            continue
+
+        item = {}
+
+        if raw["title"]:
+            item["title"] = raw["title"]
+
+        if raw["link"]:
+            item["link"] = urljoin(url, raw["link"])
+
+        # Optional fields
+        if raw["description"]:
+            item["description"] = raw["description"]
+
+        if raw["image"]:
+            item["image"] = raw["image"]
+
+        date_text = raw["date"]
+        if date_text:
+            try:
+                item["date"] = _parse_date(date_text, date_fmt)
+            except ValueError:
+                # Try to extract a date pattern from the text
+                date_match = _DATE_RE.search(date_text)
+                if date_match:
+                    try:
+                        item["date"] = _parse_date(date_match.group(), date_fmt)
+                    except ValueError:
+                        pass
+
+        if item.get("title") and item.get("link"):
+            items.append(item)
+
     return items
 
 
 def scrape_js_website(url: str, config: dict) -> list:
     """
-    Scrape with automatic retry on browser crash.
-    If the browser dies mid-request, restart it and retry once.
-    Gunicorn sync worker ensures only one request runs at a time.
+    Scrape on the browser loop, blocking the calling request thread.
+    Pages for concurrent requests render in parallel, up to POOL_MAX_SIZE.
     """
-    max_attempts = 2
-
-    for attempt in range(1, max_attempts + 1):
-        try:
-            return _scrape_page(url, config)
-        except Exception as e:
-            if attempt < max_attempts and _is_browser_crash(e):
-                logger.warning(f"Browser crashed on attempt {attempt}, restarting: {e}")
-                _force_restart_browser()
-                continue
-            raise
+    return _run(_with_context_async(_scrape_page_async, url, config, key=urlparse(url).netloc))
 
 
-def generate_rss(items: list, feed_title: str, feed_url: str) -> str:
+def generate_rss(items: list, feed_title: str, feed_url: str) -> bytes:
     """Generate RSS XML from scraped items"""
     fg = FeedGenerator()
     fg.title(feed_title)
@@ -231,7 +739,50 @@ def generate_rss(items: list, feed_title: str, feed_url: str) -> str:
 
         fe.published(item.get("date", datetime.now(timezone.utc)))
 
-    return fg.rss_str(pretty=True).decode("utf-8")
+    return fg.rss_str(pretty=False)
+
+
+# Characters XML 1.0 does not allow (lxml rejects them when feedgen builds the tree)
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+
+def _xml_text(value: str, entities: dict = None) -> str:
+    return escape(_XML_INVALID_RE.sub("", value), entities or {})
+
+
+def generate_rss_fast(items: list, feed_title: str, feed_url: str) -> bytes:
+    """Generate RSS XML like generate_rss, without building a feedgen/lxml tree"""
+    now = format_datetime(datetime.now(timezone.utc))
+    parts = [
+        "<?xml version='1.0' encoding='UTF-8'?>\n",
+        '<rss version="2.0"><channel>',
+        f"<title>{_xml_text(feed_title)}</title>",
+        f"<link>{_xml_text(feed_url)}</link>",
+        f"<description>{_xml_text(f'Custom RSS feed for {feed_url}')}</description>",
+        "<docs>http://www.rssboard.org/rss-specification</docs>",
+        "<language>en</language>",
+        f"<lastBuildDate>{now}</lastBuildDate>",
+    ]
+
+    # feedgen prepends entries -- emit items in the same (reversed) order
+    for item in reversed(items):
+        link = _xml_text(item.get("link", feed_url))
+        parts.append(f"<item><title>{_xml_text(item.get('title', 'No title'))}</title><link>{link}</link>")
+
+        if item.get("description"):
+            parts.append(f"<description>{_xml_text(item['description'])}</description>")
+
+        parts.append(f'<guid isPermaLink="true">{_xml_text(item.get("link", ""))}</guid>')
+
+        if item.get("image"):
+            parts.append(f'<enclosure url="{_xml_text(item["image"], _ATTR_ENTITIES)}" length="0" type="image/jpeg"/>')
+
+        published = format_datetime(item["date"]) if item.get("date") else now
+        parts.append(f"<pubDate>{published}</pubDate></item>")
+
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
 
 
 @app.route("/feed")
@@ -267,19 +818,49 @@ def create_feed():
     }
 
     # Check cache
-    cache_key = hashlib.md5(f"{url}{json.dumps(config)}".encode()).hexdigest()
-    cached = cache.get(cache_key)
-
-    if cached and (datetime.now().timestamp() - cached["time"]) < CACHE_DURATION:
-        return Response(cached["data"], mimetype="application/rss+xml")
+    # Canonical JSON so equivalent configs share a cache entry
+    key_src = url.encode() + b"|" + json.dumps(config, sort_keys=True, separators=(",", ":")).encode()
+    cache_key = hashlib.blake2b(key_src, digest_size=16).hexdigest()
+    cached = _cache_get(cache_key)
+
+    if cached and _is_fresh(cached):
+        return _rss_response(cached, "HIT")
+
+    # Only one request per cache key scrapes; the rest wait on its future
+    with _cache_lock:
+        future = _inflight.get(cache_key)
+        owner = future is None
+        if owner:
+            future = _inflight[cache_key] = concurrent.futures.Future()
+
+    if owner:
+        latest = None
+        try:
+            # The previous owner may have stored its feed and left _inflight after our cache miss
+            latest = _cache_get(cache_key)
+            if not _is_fresh(latest):
+                latest = None
+            future.set_result(latest or _refresh_feed(url, config, cache_key))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _cache_lock:
+                _inflight.pop(cache_key, None)
+        if latest is not None:
+            return _rss_response(latest, "HIT")
 
-    # Scrape and generate
+    # Scrape and generate, serving the stale feed if the browser fails
     try:
-        items = scrape_js_website(url, config)
-    except TimeoutError:
+        entry = future.result(timeout=SCRAPE_TIMEOUT)
+    except (TimeoutError, concurrent.futures.TimeoutError):
         logger.error(f"Timeout scraping {url}")
+        if cached:
+            return _rss_response(cached, "STALE")
         return "Scraping timed out. The target page took too long to load.", 504
     except PlaywrightError as e:
+        if cached:
+            logger.error(f"Playwright error for {url}, serving stale feed: {e}")
+            return _rss_response(cached, "STALE")
         error_msg = str(e)
         if "Target" in error_msg and "closed" in error_msg:
             logger.error(f"Browser target closed while scraping {url}: {e}")
@@ -290,15 +871,154 @@ def create_feed():
         logger.error(f"Unexpected error scraping {url}: {e}")
         return "Internal scraping error. Please retry.", 500
 
-    if not items:
+    if entry is None:
         return "No items found. Check your CSS selectors.", 404
 
-    rss = generate_rss(items, f"Feed: {url}", url)
+    return _rss_response(entry, "MISS")
+
+
+def _cache_ttl(url: str) -> int:
+    """Freshness lifetime for a feed, from the most specific SCRAPER_CACHE_POLICY_* matching its host."""
+    host = (urlparse(url).hostname or "").lower()
+    for pattern, ttl in CACHE_POLICIES:
+        if fnmatch(host, pattern):
+            return ttl
+    return CACHE_DURATION
+
+
+def _cache_get(cache_key: str):
+    """Look up a cached feed entry, in Redis when configured."""
+    if _redis is None:
+        with _cache_lock:
+            return cache.get(cache_key)
+
+    try:
+        fields = _redis.hgetall(f"cache:{cache_key}")
+    except redis.RedisError as e:
+        logger.warning(f"Redis cache read failed: {e}")
+        return None
+    if not fields:
+        return None
+    return {
+        "body": fields[b"body"],
+        "generated_at": float(fields[b"generated_at"]),
+        "stale_at": float(fields[b"stale_at"]),
+        "etag": fields[b"etag"].decode(),
+    }
+
+
+def _cache_set(cache_key: str, entry: dict):
+    """Store a feed entry, keeping it CACHE_STALE_GRACE past its freshness lifetime."""
+    if _redis is None:
+        with _cache_lock:
+            cache[cache_key] = entry
+        return
+
+    name = f"cache:{cache_key}"
+    try:
+        with _redis.pipeline() as pipe:
+            pipe.hset(name, mapping=entry)
+            pipe.expire(name, ceil(entry["stale_at"] - time.time()) + CACHE_STALE_GRACE)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Redis cache write failed: {e}")
+
+
+def _is_fresh(entry: dict) -> bool:
+    return entry is not None and time.time() < entry["stale_at"]
+
+
+def _rss_response(entry: dict, cache_status: str) -> Response:
+    """Serve a cached feed, or an empty 304 if the client already has this version."""
+    body = entry["body"]
+    max_age = max(0, int(entry["stale_at"] - time.time()))
+
+    if request.if_none_match.contains_weak(entry["etag"]):
+        response = Response(
+            status=304,
+            headers={"Cache-Control": f"public, max-age={max_age}", "X-Cache": cache_status},
+        )
+        response.set_etag(entry["etag"])
+        return response
+
+    response = Response(
+        body,
+        mimetype="application/rss+xml",
+        headers={
+            "Content-Length": str(len(body)),
+            "Cache-Control": f"public, max-age={max_age}",
+            "X-Cache": cache_status,
+        },
+        direct_passthrough=True,
+    )
+    response.set_etag(entry["etag"])
+    return response
+
+
+def _refresh_feed(url: str, config: dict, cache_key: str):
+    """Scrape, generate and cache a feed. Returns None if no items were found."""
+    items = scrape_js_website(url, config)
+    if not items:
+        return None
+
+    if RSS_WRITER == "feedgen":
+        rss = generate_rss(items, f"Feed: {url}", url)
+    else:
+        rss = generate_rss_fast(items, f"Feed: {url}", url)
 
     # Update cache
-    cache[cache_key] = {"data": rss, "time": datetime.now().timestamp()}
+    now = time.time()
+    entry = {
+        "body": rss,
+        "generated_at": now,
+        "stale_at": now + _cache_ttl(url),
+        "etag": hashlib.blake2b(rss, digest_size=12).hexdigest(),
+    }
+    _cache_set(cache_key, entry)
+
+    return entry
 
-    return Response(rss, mimetype="application/rss+xml")
+
+# Potential item containers probed by /debug
+DEBUG_SELECTORS = [
+    "article", ".article", ".post", ".story", ".card",
+    ".story-card", ".news-item", ".entry", "[class*='story']",
+    "[class*='article']", "[class*='post']", "[class*='card']"
+]
+
+# Counts matches for every selector in a single CDP round trip
+_COUNT_SELECTORS_JS = "(sels) => Object.fromEntries(sels.map((s) => [s, document.querySelectorAll(s).length]))"
+
+
+async def _probe_page_async(context, url: str):
+    """Load a page and count matches for common item container selectors."""
+    page = await context.new_page()
+
+    try:
+        await page.route("**/*", _block_resources)
+        await page.goto(url, wait_until="load", timeout=60000)
+        await _wait_for_network_idle(page)
+
+        # Get the start of the page HTML, sliced in the browser so the full DOM never crosses CDP;
+        # a cut through a surrogate pair would leave half a character that can't be encoded as UTF-8
+        page_html = await page.evaluate(
+            r'(n) => document.documentElement.outerHTML.slice(0, n).replace(/[\ud800-\udbff]$/, "")', 10000
+        )
+
+        # Find all potential item containers
+        counts = await page.evaluate(_COUNT_SELECTORS_JS, DEBUG_SELECTORS)
+        results = [
+            f"{selector}: {count} elements found"
+            for selector, count in counts.items()
+            if count
+        ]
+
+        return page_html, results
+    finally:
+        try:
+            await page.close()
+        except Exception:
+            pass
 
 
 @app.route("/debug")
@@ -308,61 +1028,49 @@ def debug_page():
     if not url:
         return "Missing 'url' parameter", 400
 
-    last_error = None
-    for attempt in range(1, 3):
-        page = None
+    try:
+        page_html, results = _run(_with_context_async(_probe_page_async, url, key=urlparse(url).netloc))
+    except TimeoutError:
+        return "Debug timed out. The target page took too long to load.", 504
+    except Exception as e:
+        # Playwright errors quote the navigation URL in their call log
+        return f"Error: {html.escape(str(e))}", 500
+
+    safe_url = html.escape(url)
+    found = "<br>".join(html.escape(line) for line in results) if results else "No common selectors found"
+    return f"""
+    <html>
+    <head><title>Debug: {safe_url}</title></head>
+    <body style="font-family: monospace;">
+        <h1>Debug: {safe_url}</h1>
+        <h2>Potential selectors found:</h2>
+        <pre>{found}</pre>
+        <h2>Page HTML (first 10000 chars):</h2>
+        <textarea style="width:100%; height:500px;">{html.escape(page_html)}</textarea>
+    </body>
+    </html>
+    """
+
+
+@app.route("/healthz")
+def healthz():
+    """Browser usage gauges for monitoring"""
+    running = _browser is not None and _browser.is_connected()
+    version = None
+    if running:
         try:
-            browser = _get_browser()
-            page = browser.new_page()
-
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            page.wait_for_timeout(5000)
-
-            # Get page HTML
-            html = page.content()
-
-            # Find all potential item containers
-            selectors_to_try = [
-                "article", ".article", ".post", ".story", ".card",
-                ".story-card", ".news-item", ".entry", "[class*='story']",
-                "[class*='article']", "[class*='post']", "[class*='card']"
-            ]
-
-            results = []
-            for selector in selectors_to_try:
-                elements = page.query_selector_all(selector)
-                if elements:
-                    results.append(f"{selector}: {len(elements)} elements found")
-
-            return f"""
-            <html>
-            <head><title>Debug: {url}</title></head>
-            <body style="font-family: monospace;">
-                <h1>Debug: {url}</h1>
-                <h2>Potential selectors found:</h2>
-                <pre>{"<br>".join(results) if results else "No common selectors found"}</pre>
-                <h2>Page HTML (first 10000 chars):</h2>
-                <textarea style="width:100%; height:500px;">{html[:10000]}</textarea>
-            </body>
-            </html>
-            """
-        except TimeoutError:
-            return "Debug timed out. The target page took too long to load.", 504
+            version = _run(_browser_version_async(), timeout=5)
         except Exception as e:
-            last_error = e
-            if attempt < 2 and _is_browser_crash(e):
-                logger.warning(f"Browser crashed during debug (attempt {attempt}), restarting: {e}")
-                _force_restart_browser()
-                continue
-            return f"Error: {e}", 500
-        finally:
-            if page:
-                try:
-                    page.close()
-                except Exception:
-                    pass
-
-    return f"Error after retries: {last_error}", 500
+            logger.warning(f"Browser health check failed: {e}")
+            running = False
+
+    return jsonify({
+        "browser_connected": running,
+        "browser_version": version,
+        "browser_age_s": round(time.time() - _browser_started_at) if running else None,
+        "pages_served": _pages_served,
+        "pool_in_use": _pool.in_use if _pool else 0,
+    }), 200 if running or _browser is None else 503
 
 
 @app.route("/")